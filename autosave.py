@@ -0,0 +1,141 @@
+import threading
+import time
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+
+# ----------------- Write-behind Autosave -----------------
+# Verdicts are queued here by the grid and written to a MongoDB journal by a
+# background thread, so a rerun never waits on storage. Repeated edits to the
+# same cell are coalesced in memory and only the latest value is written.
+# The journal lives in the shared database, so a reviewer resumes on any
+# worker process behind the load balancer. Saved corrections to the data
+# collections are queued and written by the same thread.
+#
+#   Review_journal:  {reviewer, category, doc_id, attr, field, value}
+#   Review_progress: {reviewer, category, page, sample_ids, random_ids}
+
+JOURNAL_COLLECTION = 'Review_journal'
+PROGRESS_COLLECTION = 'Review_progress'
+FLUSH_INTERVAL = 3.0   # seconds between flushes
+FLUSH_EVERY = 50       # flush early once this many cells are pending
+
+CELL_KEYS = ('reviewer', 'category', 'doc_id', 'attr', 'field')
+
+
+class AutosaveQueue:
+    def __init__(self, db, flush_interval=FLUSH_INTERVAL, flush_every=FLUSH_EVERY):
+        self.db = db
+        self.journal = db[JOURNAL_COLLECTION]
+        self.progress = db[PROGRESS_COLLECTION]
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self._pending = {}
+        self._progress = {}
+        self._updates = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+
+        self.journal.create_index([(key, ASCENDING) for key in CELL_KEYS], unique=True)
+        self.progress.create_index([('reviewer', ASCENDING), ('category', ASCENDING)], unique=True)
+
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def put(self, reviewer, category, doc_id, attr, field, value):
+        """Queue one verdict cell; field is 'status' or 'newval'."""
+        with self._lock:
+            self._pending[(reviewer, category, doc_id, attr, field)] = value
+            full = len(self._pending) >= self.flush_every
+        if full:
+            self._wake.set()
+
+    def put_progress(self, reviewer, category, **fields):
+        """Queue progress fields (page, sample_ids, random_ids) for a reviewer and category."""
+        with self._lock:
+            self._progress.setdefault((reviewer, category), {}).update(fields)
+
+    def put_update(self, collection, doc_id, fields, pull=None):
+        """Queue a $set of fields on one document of a collection (by name), plus an optional
+        $pull of values from array fields ({field: values}); written on the next flush."""
+        with self._lock:
+            self._merge_update((collection, doc_id), fields, pull or {})
+        self._wake.set()
+
+    def _merge_update(self, key, fields, pull, newer=True):
+        update = self._updates.setdefault(key, ({}, {}))
+        if newer:
+            update[0].update(fields)
+        else:
+            for field, value in fields.items():
+                update[0].setdefault(field, value)
+        for field, values in pull.items():
+            update[1].setdefault(field, set()).update(values)
+
+    def load(self, reviewer, category):
+        """Return ({(doc_id, attr, field): value}, progress dict) journaled for a reviewer."""
+        self.flush()
+        rows = self.journal.find({'reviewer': reviewer, 'category': category},
+                                 {'_id': 0, 'doc_id': 1, 'attr': 1, 'field': 1, 'value': 1})
+        verdicts = {(r['doc_id'], r['attr'], r['field']): r['value'] for r in rows}
+        progress = self.progress.find_one({'reviewer': reviewer, 'category': category}, {'_id': 0}) or {}
+        return verdicts, progress
+
+    def flush(self):
+        # Serialise flushes so an older batch can never overwrite a newer one.
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            progress, self._progress = self._progress, {}
+            updates, self._updates = self._updates, {}
+        try:
+            if pending:
+                self.journal.bulk_write([
+                    UpdateOne(dict(zip(CELL_KEYS, key)), {'$set': {'value': value}}, upsert=True)
+                    for key, value in pending.items()
+                ], ordered=False)
+            if progress:
+                self.progress.bulk_write([
+                    UpdateOne({'reviewer': reviewer, 'category': category}, {'$set': fields}, upsert=True)
+                    for (reviewer, category), fields in progress.items()
+                ], ordered=False)
+            by_collection = {}
+            for (collection, doc_id), (fields, pull) in updates.items():
+                update = {'$set': fields} if fields else {}
+                if pull:
+                    update['$pull'] = {field: {'$in': sorted(values)} for field, values in pull.items()}
+                by_collection.setdefault(collection, []).append(UpdateOne({'_id': doc_id}, update))
+            for collection, ops in by_collection.items():
+                self.db[collection].bulk_write(ops, ordered=False)
+        except PyMongoError:
+            # Put the batch back unless a newer edit to the same cell arrived meanwhile.
+            # Every write is a $set or $pull, so repeating the part that did land is harmless.
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)
+                for key, fields in progress.items():
+                    self._progress[key] = {**fields, **self._progress.get(key, {})}
+                for key, (fields, pull) in updates.items():
+                    self._merge_update(key, fields, pull, newer=False)
+            raise
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except PyMongoError:
+                # Keep the writer alive; the next flush retries with newer values.
+                time.sleep(self.flush_interval)
+        self.flush()
@@ -0,0 +1,149 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pymongo import ReplaceOne
+
+from common import fetch_image, run_categories
+
+# ----------------- Colour Verification -----------------
+# Batch job: measures the dominant upholstery colour of every product image
+# and pre-fills verdicts for `Upholstery Color` and `Upholstery Color_Hex`.
+#
+#   python color_verify.py sofa
+#
+# Results go to `<category>_color_verdicts` as
+# {_id, dominant_rgb, <attr>: {status, value, confidence}}; the grid pre-selects
+# verdicts at or above CONFIDENCE_THRESHOLD and shows the rest for review.
+
+COLOR_ATTR = 'Upholstery Color'
+HEX_ATTR = 'Upholstery Color_Hex'
+THUMB_SIZE = 64
+CLUSTERS = 4
+ITERATIONS = 10
+CONFIDENCE_THRESHOLD = 0.6
+
+# Reference sRGB values for taxonomy colour names; names not listed here are never suggested,
+# and documents currently holding one get zero-confidence verdicts
+NAMED_COLORS = {
+    'White': (255, 255, 255), 'Off-White': (245, 242, 235), 'Ivory': (255, 255, 240),
+    'Cream': (240, 230, 200), 'Beige': (213, 196, 161), 'Taupe': (139, 122, 106),
+    'Light Gray': (190, 190, 190), 'Gray': (128, 128, 128), 'Dark Gray': (90, 90, 90),
+    'Charcoal': (54, 69, 79), 'Black': (20, 20, 20), 'Brown': (110, 70, 40),
+    'Tan': (210, 180, 140), 'Camel': (193, 154, 107), 'Red': (180, 30, 30),
+    'Burgundy': (128, 0, 32), 'Pink': (230, 170, 180), 'Orange': (230, 120, 30),
+    'Yellow': (235, 200, 50), 'Mustard': (205, 160, 40), 'Green': (60, 120, 60),
+    'Olive': (110, 110, 50), 'Sage': (160, 175, 140), 'Teal': (0, 120, 120),
+    'Blue': (40, 80, 170), 'Navy': (25, 35, 80), 'Light Blue': (160, 190, 220),
+    'Purple': (110, 60, 130),
+}
+
+
+def rgb_to_lab(rgb):
+    """Vectorised sRGB (…, 3) in 0-255 -> CIE Lab (D65)."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array([[0.4124, 0.2126, 0.0193],
+                        [0.3576, 0.7152, 0.1192],
+                        [0.1805, 0.0722, 0.9505]])
+    xyz = xyz / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([116 * f[..., 1] - 16,
+                     500 * (f[..., 0] - f[..., 1]),
+                     200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def dominant_color(img):
+    """(rgb, share) of the largest k-means cluster, ignoring the border/background colour."""
+    pixels = np.asarray(img.convert("RGB").resize((THUMB_SIZE, THUMB_SIZE)), dtype=np.float32)
+    border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+    pixels = pixels.reshape(-1, 3)
+    foreground = pixels[np.linalg.norm(pixels - np.median(border, axis=0), axis=1) > 30]
+    if len(foreground) >= len(pixels) // 10:
+        pixels = foreground
+
+    # Seed centres evenly along brightness so results are deterministic
+    order = np.argsort(pixels.sum(axis=1))
+    centres = pixels[order[np.linspace(0, len(pixels) - 1, CLUSTERS).astype(int)]]
+    for _ in range(ITERATIONS):
+        labels = ((pixels[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        counts = np.bincount(labels, minlength=CLUSTERS)
+        sums = np.zeros_like(centres)
+        np.add.at(sums, labels, pixels)
+        centres = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centres)
+    # Reassign once more so the reported share belongs to the final centres
+    labels = ((pixels[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    counts = np.bincount(labels, minlength=CLUSTERS)
+    best = counts.argmax()
+    return centres[best].round().astype(int).tolist(), float(counts[best] / len(pixels))
+
+
+def measure_url(url):
+    img = fetch_image(url, timeout=10)
+    return dominant_color(img) if img else None
+
+
+def nearest(lab, palette_lab):
+    """Index of the closest palette entry per colour and a 0-1 separation margin."""
+    dist = np.linalg.norm(lab[:, None, :] - palette_lab[None, :, :], axis=2)
+    if dist.shape[1] < 2:
+        return dist.argmin(axis=1), np.ones(len(lab))
+    two = np.sort(dist, axis=1)[:, :2]
+    return dist.argmin(axis=1), 1 - two[:, 0] / np.maximum(two[:, 1], 1e-9)
+
+
+def verdicts_for(docs, measurements, taxonomy):
+    names = [n for n in taxonomy.get(COLOR_ATTR, []) if n in NAMED_COLORS]
+    hexes = [h for h in taxonomy.get(HEX_ATTR, []) if isinstance(h, str) and len(h.strip()) == 7]
+    measured = [(doc, m) for doc, m in zip(docs, measurements) if m is not None]
+    if not measured:
+        return []
+    rgb = np.array([m[0] for _, m in measured])
+    share = np.array([m[1] for _, m in measured])
+    coverage = np.minimum(1.0, share / 0.5)  # a colour covering half the product counts fully
+    lab = rgb_to_lab(rgb)
+
+    results = [{'_id': doc['_id'], 'dominant_rgb': m[0]} for doc, m in measured]
+    if names:
+        idx, margin = nearest(lab, rgb_to_lab([NAMED_COLORS[n] for n in names]))
+        for res, (doc, _), i, conf in zip(results, measured, idx, coverage * margin):
+            # A current value without a reference colour (e.g. 'Deep Teal') cannot be judged
+            # against the measurement, so its verdict is kept as a suggestion only
+            if doc.get(COLOR_ATTR) not in NAMED_COLORS:
+                conf = 0.0
+            res[COLOR_ATTR] = {
+                'status': "Correct" if doc.get(COLOR_ATTR) == names[i] else "Wrong",
+                'value': names[i],
+                'confidence': round(float(conf), 3)
+            }
+    if hexes:
+        palette = [[int(h.strip()[k:k + 2], 16) for k in (1, 3, 5)] for h in hexes]
+        idx, margin = nearest(lab, rgb_to_lab(palette))
+        for res, (doc, _), i, conf in zip(results, measured, idx, coverage * margin):
+            res[HEX_ATTR] = {
+                'status': "Correct" if hexes[i].upper() in str(doc.get(HEX_ATTR, "")).upper() else "Wrong",
+                'value': hexes[i],
+                'confidence': round(float(conf), 3)
+            }
+    return results
+
+
+def verify_category(db, category):
+    taxonomy = db[f'{category}_taxonomy'].find_one() or {}
+    docs = list(db[f'Attributes_Validation_{category}'].find({}, {'Image URL': 1, COLOR_ATTR: 1, HEX_ATTR: 1}))
+    with ProcessPoolExecutor() as pool:
+        measurements = list(pool.map(measure_url, [d.get('Image URL') for d in docs], chunksize=16))
+    results = verdicts_for(docs, measurements, taxonomy)
+    if results:
+        db[f'{category}_color_verdicts'].bulk_write(
+            [ReplaceOne({'_id': r['_id']}, r, upsert=True) for r in results], ordered=False
+        )
+    confident = sum(
+        1 for r in results
+        if r.get(COLOR_ATTR, {}).get('confidence', 0) >= CONFIDENCE_THRESHOLD
+    )
+    return len(docs), len(results), confident
+
+
+if __name__ == "__main__":
+    run_categories(verify_category,
+                   lambda category, r: f"{category}: {r[1]}/{r[0]} images measured, {r[2]} confident colour verdicts")
@@ -0,0 +1,42 @@
+import os
+import sys
+from io import BytesIO
+
+import requests
+from PIL import Image
+from pymongo import MongoClient
+
+# ----------------- Shared Settings and Helpers -----------------
+# Used by the validation grid and the offline batch jobs. The MongoDB
+# connection string is read from the MONGO_URI environment variable, so no
+# script carries credentials.
+
+CATEGORIES = ['sofa', 'coffee_table', 'accent_chair']
+
+
+def get_db():
+    uri = os.environ.get("MONGO_URI")
+    if not uri:
+        raise SystemExit("Set the MONGO_URI environment variable to the MongoDB connection string.")
+    return MongoClient(uri)['console']
+
+
+def fetch_image(url, timeout=5):
+    """Download and decode an image; None when the URL is not a readable image."""
+    try:
+        resp = requests.get(url, timeout=timeout)
+        if resp.status_code == 200 and "image" in resp.headers.get("content-type", "").lower():
+            img = Image.open(BytesIO(resp.content))
+            img.load()
+            return img
+    except Exception:
+        pass
+    return None
+
+
+def run_categories(job, describe):
+    """Command-line entry for the jobs: run job(db, category) for each category
+    named in argv (default: all) and print describe(category, result)."""
+    db = get_db()
+    for category in sys.argv[1:] or CATEGORIES:
+        print(describe(category, job(db, category)))
@@ -0,0 +1,320 @@
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest import mock
+
+import mongomock
+import numpy as np
+from PIL import Image
+from pymongo import UpdateOne
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+
+# ----------------- Concurrent Reviewer Load Test -----------------
+# Drives a validation app headlessly with N simulated reviewers, each in its
+# own AppTest session, against an in-memory MongoDB stand-in (mongomock) and a
+# local image server with injected latency. Needs `pip install -r requirements-dev.txt`.
+#
+#   python load_test.py --app Validation_main.py --reviewers 50 --actions 20
+#   python load_test.py --with-jobs    # also seed the batch-job outputs
+#
+# --with-jobs seeds what the offline jobs produce (image index, colour
+# verdicts, taxonomy flags, review ranking) and writes an Arrow snapshot, so
+# the dedup, colour, flag, ranking and snapshot paths of the app are covered.
+# Once all sessions finish, every reviewer reconnects in a fresh session,
+# which exercises the autosave resume path.
+# Reports rerun latency percentiles per action, MongoDB operation counts,
+# image requests and approximate memory per session. --max-p95 exits non-zero
+# when the overall p95 rerun latency (seconds) exceeds the limit.
+
+COUNTED_METHODS = [
+    'find', 'find_one', 'insert_one', 'insert_many', 'update_one', 'update_many',
+    'replace_one', 'bulk_write', 'delete_one', 'delete_many', 'create_index',
+]
+TAXONOMY = {
+    'Sub Type': ['Loveseat', 'Sectional', 'Sleeper', 'Standard', 'Modular', 'Chaise'],
+    'Pattern': ['Solid', 'Striped', 'Floral', 'Geometric', 'Abstract'],
+    'Upholstery Color': ["Off-White", "Ivory", "Cream", "Beige", "Taupe", "Light Gray", "Charcoal", "Black"],
+    'Leg Visibility': ['Exposed', 'Hidden', 'No legs'],
+    'Visual Weight': ['Light', 'Medium', 'Heavy'],
+}
+
+
+# ----------------- Local Image Server -----------------
+def start_image_server(latency):
+    buf = BytesIO()
+    Image.new("RGB", (400, 300), (213, 196, 161)).save(buf, format="PNG")
+    body = buf.getvalue()
+    hits = Counter()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            hits['image_requests'] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+
+# ----------------- MongoDB Stand-in -----------------
+def seed(db, categories, docs, image_base, with_jobs=False):
+    rng = random.Random(0)
+    for category in categories:
+        db[f'{category}_taxonomy'].insert_one(dict(TAXONOMY))
+        db[f'Attributes_Validation_{category}'].insert_many([
+            dict(
+                {'SLNO': f"S{i:05d}", 'Image URL': f"{image_base}/{category}/{i}.png"},
+                **{attr: rng.choice(values) for attr, values in TAXONOMY.items()}
+            )
+            for i in range(docs)
+        ])
+        if with_jobs:
+            seed_job_outputs(db, category, rng)
+
+
+def seed_job_outputs(db, category, rng):
+    """Write what the offline jobs would produce for a category, plus a snapshot of it."""
+    # Imported here so snapshot.SNAPSHOT_DIR is read after the harness points it at its temp dir
+    import snapshot
+    from color_verify import COLOR_ATTR, NAMED_COLORS, verdicts_for
+    from review_priority import rank_category
+    from taxonomy_scan import scan_category
+
+    collection = db[f'Attributes_Validation_{category}']
+    docs = list(collection.find().sort('SLNO', 1))
+
+    # Model confidences for the ranking and a few values outside the taxonomy for the scan
+    ops = []
+    for doc in docs:
+        fields = {'model_confidence': {attr: round(rng.random(), 3) for attr in TAXONOMY}}
+        if rng.random() < 0.05:
+            fields['Sub Type'] = 'Recliner'
+        ops.append(UpdateOne({'_id': doc['_id']}, {'$set': fields}))
+    collection.bulk_write(ops)
+
+    # In every block of five listings the first three are variants sharing one image
+    leaders = [i - i % 5 if i % 5 < 3 else i for i in range(len(docs))]
+    db[f'{category}_image_index'].insert_many([
+        {'_id': doc['_id'], 'phash': f"{leader:016x}", 'group': docs[leader]['_id']}
+        for doc, leader in zip(docs, leaders)
+    ])
+
+    # Dominant colours near a taxonomy colour, with coverage spread around the confidence threshold
+    palette = [NAMED_COLORS[name] for name in TAXONOMY[COLOR_ATTR]]
+    measurements = [
+        ([min(255, max(0, c + rng.randint(-25, 25))) for c in rng.choice(palette)], rng.uniform(0.2, 0.9))
+        for _ in docs
+    ]
+    db[f'{category}_color_verdicts'].insert_many(verdicts_for(docs, measurements, TAXONOMY))
+
+    scan_category(db, category)
+    rank_category(db, category)
+    snapshot.write_snapshot(db, category)
+
+
+def count_operations(ops):
+    """Patch mongomock collections so every call is counted by method name."""
+    lock = threading.Lock()
+    patches = []
+    for name in COUNTED_METHODS:
+        original = getattr(mongomock.collection.Collection, name)
+
+        def counted(self, *args, _original=original, _name=name, **kwargs):
+            with lock:
+                ops[_name] += 1
+            return _original(self, *args, **kwargs)
+
+        patches.append(mock.patch.object(mongomock.collection.Collection, name, counted))
+    return patches
+
+
+# ----------------- Reviewer Simulation -----------------
+def timed_run(at, action, latencies):
+    began = time.perf_counter()
+    at.run()
+    latencies[action].append(time.perf_counter() - began)
+    if at.exception:
+        raise RuntimeError(f"{action}: {at.exception[0].value}")
+
+
+def reviewer_session(app_path, reviewer, actions, latencies, timeout):
+    rng = random.Random(reviewer)
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    timed_run(at, 'initial load', latencies)
+    reviewer_inputs = [t for t in at.text_input if t.key == 'reviewer']
+    if reviewer_inputs:
+        reviewer_inputs[0].input(f"reviewer-{reviewer}")
+        timed_run(at, 'resume', latencies)
+
+    for _ in range(actions):
+        roll = rng.random()
+        if roll < 0.6 and at.radio:
+            radio = rng.choice(list(at.radio))
+            radio.set_value("Wrong" if radio.value == "Correct" else "Correct")
+            timed_run(at, 'verdict', latencies)
+            corrections = [s for s in at.selectbox if s.label.startswith("Select correct") and len(s.options) > 1]
+            if corrections:
+                box = rng.choice(corrections)
+                box.set_value(rng.choice(box.options[1:]))
+                timed_run(at, 'correction', latencies)
+        elif roll < 0.8:
+            button = [b for b in at.button if "Save" in b.label]
+            if button:
+                button[0].click()
+                timed_run(at, 'save', latencies)
+        else:
+            label = "Next" if rng.random() < 0.8 else "Previous"
+            button = [b for b in at.button if label in b.label]
+            if button:
+                button[0].click()
+                timed_run(at, 'page', latencies)
+    return at
+
+
+def reconnect_session(app_path, reviewer, previous, latencies, timeout):
+    """Sign in again as the same reviewer in a fresh session; the journal must bring the sample back."""
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    timed_run(at, 'initial load', latencies)
+    reviewer_inputs = [t for t in at.text_input if t.key == 'reviewer']
+    if not reviewer_inputs:
+        return
+    reviewer_inputs[0].input(f"reviewer-{reviewer}")
+    timed_run(at, 'reconnect', latencies)
+    if 'sample_ids' in previous.session_state and at.session_state['sample_ids'] != previous.session_state['sample_ids']:
+        raise RuntimeError(f"reconnect: reviewer-{reviewer} resumed a different sample")
+
+
+def percentiles(values):
+    arr = np.array(values) * 1000
+    return {
+        'count': len(arr),
+        'p50_ms': round(float(np.percentile(arr, 50)), 1),
+        'p90_ms': round(float(np.percentile(arr, 90)), 1),
+        'p95_ms': round(float(np.percentile(arr, 95)), 1),
+        'p99_ms': round(float(np.percentile(arr, 99)), 1),
+        'max_ms': round(float(arr.max()), 1),
+    }
+
+
+def run_load_test(app_path, reviewers, actions, docs, latency, with_jobs=False, timeout=120):
+    app_path = os.path.abspath(app_path)
+    server, hits = start_image_server(latency)
+    image_base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Snapshots go to a temp dir: empty unless --with-jobs writes one, so the app otherwise reads the collections
+    workdir = tempfile.mkdtemp(prefix="wayfair_load_")
+    environment = mock.patch.dict(os.environ, {'MONGO_URI': 'mongodb://load-test', 'SNAPSHOT_DIR': workdir})
+    environment.start()
+
+    client = mongomock.MongoClient()
+    seed(client['console'], ['sofa', 'coffee_table', 'accent_chair'], docs, image_base, with_jobs)
+    ops = Counter()
+
+    def make_client(*args, **kwargs):
+        ops['MongoClient()'] += 1
+        return client
+
+    latencies = defaultdict(list)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    patches = count_operations(ops) + [
+        mock.patch('pymongo.MongoClient', make_client),  # apps that connect directly
+        mock.patch('common.MongoClient', make_client),   # apps and jobs using common.get_db()
+    ]
+    errors = []
+    began = time.perf_counter()
+    try:
+        for p in patches:
+            p.start()
+        # AppTest.run() sets global.appTest only for its own run and then restores it, which
+        # would switch it off under other sessions mid-run; hold it on for the whole test
+        with patch_config_options({"global.appTest": True}), ThreadPoolExecutor(max_workers=reviewers) as pool:
+            futures = {
+                r: pool.submit(reviewer_session, app_path, r, actions, latencies, timeout)
+                for r in range(reviewers)
+            }
+            sessions = {}
+            for r, future in futures.items():
+                try:
+                    sessions[r] = future.result()
+                except Exception as exc:
+                    errors.append(str(exc))
+
+            # Second wave: every reviewer comes back in a new session to exercise autosave resume
+            futures = [
+                pool.submit(reconnect_session, app_path, r, at, latencies, timeout)
+                for r, at in sessions.items()
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as exc:
+                    errors.append(str(exc))
+    finally:
+        for p in reversed(patches):
+            p.stop()
+        environment.stop()
+        server.shutdown()
+    elapsed = time.perf_counter() - began
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    reruns = sum(len(v) for v in latencies.values())
+    all_latencies = [x for v in latencies.values() for x in v]
+    return {
+        'app': os.path.basename(app_path),
+        'reviewers': reviewers,
+        'actions_per_reviewer': actions,
+        'documents_per_category': docs,
+        'with_jobs': with_jobs,
+        'image_latency_s': latency,
+        'wall_time_s': round(elapsed, 1),
+        'reruns': reruns,
+        'errors': errors,
+        'rerun_latency': dict(
+            {'all': percentiles(all_latencies)} if all_latencies else {},
+            **{action: percentiles(v) for action, v in latencies.items()}
+        ),
+        'mongo_operations': dict(ops),
+        'mongo_operations_per_rerun': round(sum(ops.values()) / max(reruns, 1), 2),
+        'image_requests': hits['image_requests'],
+        # ru_maxrss is in KiB on Linux; peak growth is an upper bound on per-session cost
+        'peak_rss_growth_per_session_mb': round((rss_after - rss_before) / 1024 / reviewers, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent reviewer load test for the validation apps")
+    parser.add_argument("--app", default="Validation_main.py")
+    parser.add_argument("--reviewers", type=int, default=10)
+    parser.add_argument("--actions", type=int, default=20, help="interactions per reviewer")
+    parser.add_argument("--docs", type=int, default=500, help="documents per category")
+    parser.add_argument("--latency", type=float, default=0.2, help="injected image latency in seconds")
+    parser.add_argument("--max-p95", type=float, default=None, help="fail if overall p95 rerun latency exceeds this (s)")
+    parser.add_argument("--with-jobs", action="store_true",
+                        help="seed image index, colour verdicts, flags and ranking, and write a snapshot")
+    args = parser.parse_args()
+
+    report = run_load_test(args.app, args.reviewers, args.actions, args.docs, args.latency, args.with_jobs)
+    print(json.dumps(report, indent=2))
+    if report['errors']:
+        sys.exit(1)
+    if args.max_p95 is not None and report['rerun_latency']['all']['p95_ms'] > args.max_p95 * 1000:
+        sys.exit(1)
@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+from pymongo import ReplaceOne
+
+from common import fetch_image, run_categories
+
+# ----------------- Perceptual-hash Index -----------------
+# Offline job: hashes every product image of a category and groups listings
+# that reuse the same picture (colour/size variants), so the validation grid
+# can show one representative per group.
+#
+#   python phash_index.py sofa
+#
+# Results go to `<category>_image_index` as {_id, phash, group}, where `group`
+# is the _id of the representative document. Every member is within
+# HAMMING_THRESHOLD bits of its representative.
+
+HASH_SIZE = 8            # 8x8 low-frequency DCT block -> 64-bit hash
+HAMMING_THRESHOLD = 6    # max differing bits to count as the same image
+
+# Attributes that follow from the shared image alone. Colour, hex, fabric,
+# finish and size-dependent fields (Sub Type, Visual Weight) differ between
+# colour/size variants, so corrections to them are never copied.
+IMAGE_ATTRS = ['Product Type', 'Silhouette', 'Shape Form', 'Back Style', 'Leg Visibility']
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    mat = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    mat[0] *= 1 / np.sqrt(2)
+    return mat * np.sqrt(2 / n)
+
+
+_DCT = _dct_matrix(HASH_SIZE * 4)
+
+
+def phash(img):
+    """64-bit perceptual hash of a PIL image."""
+    small = img.convert("L").resize((HASH_SIZE * 4, HASH_SIZE * 4), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    bits = low > np.median(low[1:])  # ignore the DC term for the threshold
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hash_url(url):
+    img = fetch_image(url, timeout=10)
+    return phash(img) if img else None
+
+
+def group_hashes(hashes, threshold=HAMMING_THRESHOLD):
+    """Map each position to the position of its group's representative (None hashes stay alone).
+
+    Leader clustering: hashes are taken in order and join the nearest existing
+    representative within `threshold` bits, otherwise they start a new group.
+    Every member is therefore close to its representative itself, so chains of
+    near matches cannot merge unrelated products.
+    """
+    groups = list(range(len(hashes)))
+    valid = [i for i, h in enumerate(hashes) if h is not None]
+    if not valid:
+        return groups
+    words = np.array([hashes[i] for i in valid], dtype=np.uint64)
+    bits = np.unpackbits(words.view(np.uint8).reshape(-1, 8), axis=1).astype(np.float32)
+    ones = bits.sum(axis=1)
+
+    leaders = []                                   # positions in `hashes`
+    leader_bits = np.empty_like(bits)              # rows [:len(leaders)] are in use
+    leader_ones = np.empty_like(ones)
+    for k, i in enumerate(valid):
+        n = len(leaders)
+        if n:
+            # Hamming distance via popcounts: |a| + |b| - 2 * |a & b|
+            dist = leader_ones[:n] + ones[k] - 2 * (leader_bits[:n] @ bits[k])
+            best = int(dist.argmin())
+            if dist[best] <= threshold:
+                groups[i] = leaders[best]
+                continue
+        leaders.append(i)
+        leader_bits[n] = bits[k]
+        leader_ones[n] = ones[k]
+    return groups
+
+
+def build_index(db, category):
+    docs = list(db[f'Attributes_Validation_{category}'].find({}, {'Image URL': 1}).sort('_id', 1))
+    with ProcessPoolExecutor() as pool:
+        hashes = list(pool.map(hash_url, [d.get('Image URL') for d in docs], chunksize=16))
+    groups = group_hashes(hashes)
+
+    ops = [
+        ReplaceOne(
+            {'_id': doc['_id']},
+            {'phash': None if h is None else f"{h:016x}", 'group': docs[g]['_id']},
+            upsert=True
+        )
+        for doc, h, g in zip(docs, hashes, groups)
+    ]
+    index_collection = db[f'{category}_image_index']
+    if ops:
+        index_collection.bulk_write(ops, ordered=False)
+    index_collection.create_index('group')
+    return len(docs), len(set(groups))
+
+
+if __name__ == "__main__":
+    run_categories(build_index, lambda category, r: f"{category}: {r[0]} documents, {r[1]} distinct images")
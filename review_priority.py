@@ -0,0 +1,77 @@
+from itertools import permutations
+
+import pandas as pd
+from pymongo import UpdateOne
+
+from common import run_categories
+
+# ----------------- Review Prioritisation -----------------
+# Batch job: scores every document by how likely its predictions are wrong
+# and stores it as `review_priority` (higher = review sooner), with an index
+# the grid walks to serve the ranking. Three signals, each rank-normalised:
+#   - uncertainty: 1 - lowest stored model confidence (`model_confidence` {attr: score})
+#   - disagreement: how unusual each pair of predicted values is together
+#   - rarity: how uncommon each predicted value is within its attribute
+#
+#   python review_priority.py sofa
+
+META_COLS = ['_id', 'SLNO', 'Image URL', 'taxonomy_flags', 'model_confidence', 'review_priority']
+WEIGHTS = {'uncertainty': 0.5, 'disagreement': 0.3, 'rarity': 0.2}
+WRITE_BATCH = 5000
+
+
+def priority_scores(df):
+    """Series of review priorities in [0, 1], aligned with df's index."""
+    attrs = [c for c in df.columns if c not in META_COLS]
+    values = df[attrs].astype("string").fillna("")
+    signals = {}
+
+    if 'model_confidence' in df.columns:
+        confidence = pd.DataFrame(
+            [c if isinstance(c, dict) else {} for c in df['model_confidence']], index=df.index
+        ).apply(pd.to_numeric, errors='coerce')
+        if not confidence.empty:
+            signals['uncertainty'] = 1 - confidence.min(axis=1)
+
+    # P(value) per attribute, broadcast back to every row
+    freq = pd.DataFrame({
+        attr: values[attr].map(values[attr].value_counts(normalize=True)) for attr in attrs
+    })
+    signals['rarity'] = (1 - freq).mean(axis=1)
+
+    # P(b = value_b | a = value_a) for every ordered attribute pair
+    conditional = [
+        values.groupby([a, b])[a].transform('size') / values.groupby(a)[a].transform('size')
+        for a, b in permutations(attrs, 2)
+    ]
+    if conditional:
+        signals['disagreement'] = 1 - pd.concat(conditional, axis=1).mean(axis=1)
+
+    score = pd.Series(0.0, index=df.index)
+    total = 0.0
+    for name, signal in signals.items():
+        if signal.notna().any():
+            # Rows without a signal sit mid-ranking for it
+            score += WEIGHTS[name] * signal.astype(float).rank(pct=True).fillna(0.5)
+            total += WEIGHTS[name]
+    return score / total if total else score
+
+
+def rank_category(db, category):
+    collection = db[f'Attributes_Validation_{category}']
+    df = pd.DataFrame(list(collection.find({}, {'Image URL': 0, 'review_priority': 0})))
+    if df.empty:
+        return 0
+    scores = priority_scores(df)
+    ops = [
+        UpdateOne({'_id': doc_id}, {'$set': {'review_priority': round(float(score), 6)}})
+        for doc_id, score in zip(df['_id'], scores)
+    ]
+    for lo in range(0, len(ops), WRITE_BATCH):
+        collection.bulk_write(ops[lo:lo + WRITE_BATCH], ordered=False)
+    collection.create_index([('review_priority', -1), ('_id', 1)])
+    return len(ops)
+
+
+if __name__ == "__main__":
+    run_categories(rank_category, lambda category, ranked: f"{category}: ranked {ranked} documents")
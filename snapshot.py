@@ -0,0 +1,103 @@
+import json
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from common import run_categories
+
+# ----------------- Shared Category Snapshots -----------------
+# One loader writes each category's documents to an uncompressed Arrow IPC
+# file plus its taxonomy, stamped with a version. Every Streamlit worker maps
+# the file read-only, so all processes share the same page cache instead of
+# holding their own DataFrame copies.
+#
+#   python snapshot.py sofa
+#
+# Layout: <SNAPSHOT_DIR>/<category>.version holds the current version stamp;
+# <SNAPSHOT_DIR>/<category>-<version>.arrow / .json hold the data and taxonomy.
+# The pointer file is replaced atomically, so readers never see a partial write.
+# SNAPSHOT_DIR comes from the environment (default: snapshots/ next to this
+# file), so the loader and every worker resolve the same directory whatever
+# their working directory.
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+
+
+def _path(category, suffix, directory=SNAPSHOT_DIR):
+    return os.path.join(directory, f"{category}{suffix}")
+
+
+def _arrow_safe(df):
+    # Mongo fields can mix types across documents; store those as strings
+    df = df.copy()
+    df['_id'] = df['_id'].astype(str)
+    for col in df.columns[df.dtypes == object]:
+        kinds = {type(v) for v in df[col].dropna()}
+        if len(kinds) > 1 and list not in kinds and dict not in kinds:
+            df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def write_snapshot(db, category, directory=SNAPSHOT_DIR):
+    """Write the category's documents and taxonomy as a new version; return the version stamp."""
+    os.makedirs(directory, exist_ok=True)
+    df = _arrow_safe(pd.DataFrame(list(db[f'Attributes_Validation_{category}'].find())))
+    taxonomy = db[f'{category}_taxonomy'].find_one() or {}
+    taxonomy.pop('_id', None)
+
+    version = str(time.time_ns())
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(_path(category, f"-{version}.arrow", directory), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    with open(_path(category, f"-{version}.json", directory), "w") as f:
+        json.dump(taxonomy, f)
+
+    previous = current_version(category, directory)
+    pointer = _path(category, ".version", directory)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+
+    # Keep the previous version for workers still switching over; drop anything older
+    keep = {f"{category}-{v}{ext}" for v in (version, previous) for ext in (".arrow", ".json")}
+    for name in os.listdir(directory):
+        if name.startswith(f"{category}-") and name.endswith((".arrow", ".json")) and name not in keep:
+            os.remove(os.path.join(directory, name))
+    return version
+
+
+def current_version(category, directory=SNAPSHOT_DIR):
+    try:
+        with open(_path(category, ".version", directory)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def has_version(category, version, directory=SNAPSHOT_DIR):
+    return all(os.path.exists(_path(category, f"-{version}{ext}", directory)) for ext in (".arrow", ".json"))
+
+
+def open_snapshot(category, version, directory=SNAPSHOT_DIR):
+    """Memory-map a snapshot read-only; returns (arrow table, taxonomy dict) without copying the data."""
+    source = pa.memory_map(_path(category, f"-{version}.arrow", directory), "r")
+    table = pa.ipc.open_file(source).read_all()
+    with open(_path(category, f"-{version}.json", directory)) as f:
+        taxonomy = json.load(f)
+    return table, taxonomy
+
+
+def take(table, positions):
+    """Materialise only the requested rows as a DataFrame."""
+    df = table.take(pa.array(positions, type=pa.int64())).to_pandas()
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            df[field.name] = df[field.name].map(lambda v: v if v is None else list(v))
+    return df
+
+
+if __name__ == "__main__":
+    run_categories(write_snapshot, lambda category, version: f"{category}: snapshot version {version}")
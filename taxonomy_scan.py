@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+
+from common import run_categories
+
+# ----------------- Taxonomy Conformance Scan -----------------
+# Batch job: flags predicted values that are not in the category taxonomy at
+# all (e.g. a `Sub Type` outside the allowed list). Each document gets a
+# `taxonomy_flags` field listing its non-conforming attributes, which the grid
+# uses to show flagged rows first and pre-select "Wrong" for those values.
+# Only documents whose flags changed since the last scan are written.
+#
+#   python taxonomy_scan.py sofa
+
+CHUNK_SIZE = 5000
+
+
+def nonconforming(chunk, taxonomy):
+    """Boolean frame (rows x taxonomy attributes): True where a value is outside the taxonomy."""
+    flags = {}
+    for attr, allowed in taxonomy.items():
+        if attr not in chunk.columns or not isinstance(allowed, list):
+            continue
+        values = chunk[attr].astype("string").str.strip()
+        allowed = pd.Index([str(v).strip() for v in allowed]).unique()
+        # Categorical codes are -1 for any value not among the allowed categories
+        codes = pd.Categorical(values, categories=allowed).codes
+        flags[attr] = (codes == -1) & values.notna().to_numpy()
+    return pd.DataFrame(flags, index=chunk.index)
+
+
+def scan_category(db, category):
+    taxonomy = db[f'{category}_taxonomy'].find_one() or {}
+    taxonomy.pop('_id', None)
+    collection = db[f'Attributes_Validation_{category}']
+    projection = {attr: 1 for attr in taxonomy}
+    projection['taxonomy_flags'] = 1
+
+    scanned = flagged = written = 0
+    cursor = collection.find({}, projection, batch_size=CHUNK_SIZE)
+    while True:
+        batch = [doc for _, doc in zip(range(CHUNK_SIZE), cursor)]
+        if not batch:
+            break
+        chunk = pd.DataFrame(batch)
+        flags = nonconforming(chunk, taxonomy)
+        attrs = np.array(flags.columns, dtype=object)
+        matrix = flags.to_numpy(dtype=bool)
+        previous = chunk['taxonomy_flags'] if 'taxonomy_flags' in chunk.columns else [None] * len(chunk)
+        ops = [
+            UpdateOne({'_id': doc_id}, {'$set': {'taxonomy_flags': attrs[row].tolist()}})
+            for doc_id, row, old in zip(chunk['_id'], matrix, previous)
+            if not isinstance(old, list) or set(old) != set(attrs[row])
+        ]
+        if ops:
+            collection.bulk_write(ops, ordered=False)
+        scanned += len(batch)
+        flagged += int(matrix.any(axis=1).sum())
+        written += len(ops)
+    return scanned, flagged, written
+
+
+if __name__ == "__main__":
+    run_categories(scan_category,
+                   lambda category, r: f"{category}: {r[0]} documents scanned, {r[1]} with non-conforming values, "
+                                       f"{r[2]} flag changes written")